@@ -1,14 +1,19 @@
 import os
 import json
+import asyncio
 import threading
+from time import monotonic
+from typing import Optional
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from flask import Flask
 from dotenv import load_dotenv
 
+from presence import VoicePresenceTracker
 from todomate import (
     fetch_todo_items_today,
     generate_todo_summary_today,
@@ -23,8 +28,12 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 TASKS_CHANNEL_ID = int(os.getenv("TASKS_CHANNEL_ID", "0"))
 CALLS_CHANNEL_ID = int(os.getenv("CALLS_CHANNEL_ID", "0"))
 USERS = json.loads(os.getenv("USERS", "{}"))
+WATCHED_VOICE_CHANNELS = [int(c) for c in json.loads(os.getenv("WATCHED_VOICE_CHANNELS", "[1346875171222454307]"))]
+VOICE_DEBOUNCE_SECONDS = int(os.getenv("VOICE_DEBOUNCE_SECONDS", "30"))
+RENDER_CACHE_SECONDS = int(os.getenv("RENDER_CACHE_SECONDS", "60"))
 
 REMINDER_INTERVALS = [120, 60, 30, 10, 5]
+MAX_RANGE_DAYS = 31
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -39,13 +48,16 @@ intents.message_content = True
 intents.voice_states = True
 intents.members = True
 bot = commands.Bot(command_prefix="!", intents=intents)
+slash_commands_synced = False
 
 @bot.event
 async def on_ready():
+    global slash_commands_synced
     print(f"✅ Logged in as {bot.user}", flush=True)
     print(f"🔧 Tasks Channel ID: {TASKS_CHANNEL_ID}", flush=True)
     print(f"🔧 Calls Channel ID: {CALLS_CHANNEL_ID}", flush=True)
     print(f"🔧 Users: {USERS}", flush=True)
+    print(f"🔧 Watched voice channels: {WATCHED_VOICE_CHANNELS}", flush=True)
     
     # Verify channels exist
     tasks_channel = bot.get_channel(TASKS_CHANNEL_ID)
@@ -60,7 +72,25 @@ async def on_ready():
         print(f"❌ Calls channel with ID {CALLS_CHANNEL_ID} not found!", flush=True)
     else:
         print(f"✅ Calls channel found: {calls_channel.name}", flush=True)
+
+    # Seed voice occupancy from who is already in the watched channels
+    for channel_id in WATCHED_VOICE_CHANNELS:
+        voice_channel = bot.get_channel(channel_id)
+        if not voice_channel:
+            print(f"❌ Watched voice channel with ID {channel_id} not found!", flush=True)
+            continue
+        voice_tracker.seed(channel_id, [m.id for m in voice_channel.members])
+        print(f"✅ Watching voice channel: {voice_channel.name} ({len(voice_channel.members)} members)", flush=True)
     
+    # Register slash commands once per process
+    if not slash_commands_synced:
+        try:
+            synced = await bot.tree.sync()
+            slash_commands_synced = True
+            print(f"✅ Synced {len(synced)} slash commands", flush=True)
+        except Exception as e:
+            print(f"❌ Failed to sync slash commands: {e}", flush=True)
+
     # Start background tasks
     if not check_and_send_reminders.is_running():
         check_and_send_reminders.start()
@@ -80,7 +110,7 @@ async def check_and_send_reminders():
         if any(now.hour == t.hour and now.minute == t.minute for t in send_times):
             print(f"📅 Sending daily summary at {now.strftime('%H:%M')}", flush=True)
             try:
-                summary = generate_todo_summary_today(USERS)
+                summary = await asyncio.to_thread(generate_todo_summary_today, USERS)
                 channel = bot.get_channel(TASKS_CHANNEL_ID)
                 if channel and summary:
                     await channel.send(summary)
@@ -94,7 +124,7 @@ async def check_and_send_reminders():
 
         # Per-user reminders
         try:
-            raw_data = fetch_todo_items_today(USERS)
+            raw_data = await asyncio.to_thread(fetch_todo_items_today, USERS)
             todos_by_user = json.loads(raw_data) if isinstance(raw_data, str) else raw_data
             user_lookup = {v["todomate"]: k for k, v in USERS.items() if "todomate" in v}
 
@@ -140,7 +170,7 @@ async def send_tomorrow_summary():
         if now.hour == 22 and now.minute == 30:
             print(f"🌙 Sending tomorrow's summary at {now.strftime('%H:%M')}", flush=True)
             try:
-                summary = generate_todo_summary_tomorrow(USERS)
+                summary = await asyncio.to_thread(generate_todo_summary_tomorrow, USERS)
                 channel = bot.get_channel(TASKS_CHANNEL_ID)
                 if channel and summary:
                     await channel.send(f"🌙 Here's what everyone has tomorrow:\n{summary}")
@@ -162,7 +192,7 @@ async def send_backlog_summary():
         if now.hour == 6 and now.minute == 0:
             print(f"📜 Sending backlog summary at {now.strftime('%H:%M')}", flush=True)
             try:
-                summary = generate_todo_summary_backlog(USERS)
+                summary = await asyncio.to_thread(generate_todo_summary_backlog, USERS)
                 channel = bot.get_channel(TASKS_CHANNEL_ID)
                 if channel and summary:
                     await channel.send(f"📜 Here's the backlog of unfinished tasks:\n{summary}")
@@ -176,60 +206,61 @@ async def send_backlog_summary():
     except Exception as e:
         print(f"❌ Critical error in send_backlog_summary: {e}", flush=True)
 
-# Voice channel join/leave notification
-@bot.event
-async def on_voice_state_update(member, before, after):
-    try:
-        member_id_str = str(member.id)
-        print(f"🎤 Voice state update for {member.display_name} (ID: {member_id_str})", flush=True)
-        print(f"   Before: {before.channel.name if before.channel else 'None'}", flush=True)
-        print(f"   After: {after.channel.name if after.channel else 'None'}", flush=True)
+# Voice channel join/leave notifications
+async def notify_others(member_id, emoji, message):
+    channel = bot.get_channel(CALLS_CHANNEL_ID)
+    if not channel:
+        print(f"❌ Calls channel with ID {CALLS_CHANNEL_ID} not found!", flush=True)
+        return
 
-        if member_id_str not in USERS:
-            print(f"   User {member_id_str} not in USERS config", flush=True)
+    member_id_str = str(member_id)
+    for other_id in USERS:
+        if other_id != member_id_str:
+            try:
+                await channel.send(f"{emoji} <@{other_id}>, {message}")
+                print(f"   Notified user {other_id}", flush=True)
+            except Exception as e:
+                print(f"   Failed to notify user {other_id}: {e}", flush=True)
+
+async def on_watched_channel_join(member_id, channel_id):
+    try:
+        if str(member_id) not in USERS:
             return
+        voice_channel = bot.get_channel(channel_id)
+        name = voice_channel.name if voice_channel else channel_id
+        print(f"   First user in {name}, notifying others", flush=True)
+        await notify_others(member_id, "📢", f"<@{member_id}> just joined **{name}**!")
+    except Exception as e:
+        print(f"❌ Voice join notification error for {member_id}: {e}", flush=True)
 
-        channel = bot.get_channel(CALLS_CHANNEL_ID)
-        if not channel:
-            print(f"❌ Calls channel with ID {CALLS_CHANNEL_ID} not found!", flush=True)
+async def on_watched_channel_leave(member_id, channel_id):
+    try:
+        if str(member_id) not in USERS:
             return
+        voice_channel = bot.get_channel(channel_id)
+        name = voice_channel.name if voice_channel else channel_id
+        print(f"   User {member_id} left {name}, notifying others", flush=True)
+        await notify_others(member_id, "👋", f"<@{member_id}> just left **{name}**.")
+    except Exception as e:
+        print(f"❌ Voice leave notification error for {member_id}: {e}", flush=True)
 
-        # User joined a voice channel
-        if before.channel is None and after.channel is not None:
-            print(f"   User joined channel: {after.channel.name} (ID: {after.channel.id})", flush=True)
-            print(f"   Channel members count: {len(after.channel.members)}", flush=True)
-            
-            # Check if this is the Lounge voice channel AND user is first to join
-            if after.channel.id == 1346875171222454307 and len(after.channel.members) == 1:
-                print(f"   First user in the Lounge voice channel, notifying others", flush=True)
-                for other_id in USERS:
-                    if other_id != member_id_str:
-                        try:
-                            await channel.send(f"📢 <@{other_id}>, <@{member_id_str}> just joined **{after.channel.name}**!")
-                            print(f"   Notified user {other_id}", flush=True)
-                        except Exception as e:
-                            print(f"   Failed to notify user {other_id}: {e}", flush=True)
-            elif after.channel.id == 1346875171222454307:
-                print(f"   User joined Lounge but not first (members: {len(after.channel.members)})", flush=True)
-            else:
-                print(f"   User joined different voice channel: {after.channel.name} (ID: {after.channel.id})", flush=True)
-        
-        # User left a voice channel
-        elif before.channel is not None and after.channel is None:
-            print(f"   User left channel: {before.channel.name} (ID: {before.channel.id})", flush=True)
-            
-            if before.channel.id == 1346875171222454307:
-                print(f"   User left the Lounge voice channel, notifying others", flush=True)
-                for other_id in USERS:
-                    if other_id != member_id_str:
-                        try:
-                            await channel.send(f"👋 <@{other_id}>, <@{member_id_str}> just left **{before.channel.name}**.")
-                            print(f"   Notified user {other_id}", flush=True)
-                        except Exception as e:
-                            print(f"   Failed to notify user {other_id}: {e}", flush=True)
-            else:
-                print(f"   User left different voice channel: {before.channel.name} (ID: {before.channel.id})", flush=True)
+voice_tracker = VoicePresenceTracker(
+    WATCHED_VOICE_CHANNELS,
+    VOICE_DEBOUNCE_SECONDS,
+    on_watched_channel_join,
+    on_watched_channel_leave
+)
+
+@bot.event
+async def on_voice_state_update(member, before, after):
+    try:
+        print(f"🎤 Voice state update for {member.display_name} (ID: {member.id})", flush=True)
+        print(f"   Before: {before.channel.name if before.channel else 'None'}", flush=True)
+        print(f"   After: {after.channel.name if after.channel else 'None'}", flush=True)
 
+        before_id = before.channel.id if before.channel else None
+        after_id = after.channel.id if after.channel else None
+        await voice_tracker.update(member.id, before_id, after_id)
     except Exception as e:
         print(f"❌ Voice event error for {member.display_name}: {e}", flush=True)
 
@@ -246,46 +277,160 @@ async def send_tomorrow_summary_error(error):
 async def send_backlog_summary_error(error):
     print(f"❌ Error in send_backlog_summary task: {error}", flush=True)
 
-# Discord command: !today
+# Narrow USERS down to the mentioned member so only their feed is fetched
+def select_users(member):
+    if member is None:
+        return USERS
+    member_id_str = str(member.id)
+    if member_id_str not in USERS:
+        return None
+    return {member_id_str: USERS[member_id_str]}
+
+# Clamp a requested date range to something the API can reasonably serve
+def clamp_days(days):
+    return max(1, min(days, MAX_RANGE_DAYS))
+
+# Discord command: !today [@member] [category]
 @bot.command(name="today")
-async def today(ctx):
+async def today(ctx, member: Optional[discord.Member] = None, *, category: Optional[str] = None):
     try:
-        summary = generate_todo_summary_today(USERS)
+        users = select_users(member)
+        if users is None:
+            await ctx.send(f"⚠️ <@{member.id}> is not in the users list.")
+            return
+        summary = await asyncio.to_thread(generate_todo_summary_today, users, category)
         await ctx.send(summary if summary else "✅ No todos scheduled for today.")
     except Exception as e:
         await ctx.send("❌ An error occurred while fetching today's todos.")
         print("🚨 Error:", e, flush=True)
 
-# Discord command: !tom
+# Discord command: !tom [@member] [category]
 @bot.command(name="tom")
-async def tomorrow(ctx):
+async def tomorrow(ctx, member: Optional[discord.Member] = None, *, category: Optional[str] = None):
     try:
-        summary = generate_todo_summary_tomorrow(USERS)
+        users = select_users(member)
+        if users is None:
+            await ctx.send(f"⚠️ <@{member.id}> is not in the users list.")
+            return
+        summary = await asyncio.to_thread(generate_todo_summary_tomorrow, users, category)
         await ctx.send(summary if summary else "✅ No todos scheduled for tomorrow.")
     except Exception as e:
         await ctx.send("❌ An error occurred while fetching tomorrow's todos.")
         print("🚨 Error:", e, flush=True)
 
-# Discord command: !week
+# Discord command: !week [@member] [days] [category]
 @bot.command(name="week")
-async def week(ctx):
+async def week(ctx, member: Optional[discord.Member] = None, days: Optional[int] = 7, *, category: Optional[str] = None):
     try:
-        summary = generate_todo_summary_week(USERS)
+        users = select_users(member)
+        if users is None:
+            await ctx.send(f"⚠️ <@{member.id}> is not in the users list.")
+            return
+        summary = await asyncio.to_thread(generate_todo_summary_week, users, category, clamp_days(days))
         await ctx.send(summary if summary else "✅ No upcoming todos.")
     except Exception as e:
         await ctx.send("❌ An error occurred while fetching upcoming todos.")
         print("🚨 Error:", e, flush=True)
 
-# Discord command: !backlog
+# Discord command: !backlog [@member] [days] [category]
 @bot.command(name="backlog")
-async def backlog(ctx):
+async def backlog(ctx, member: Optional[discord.Member] = None, days: Optional[int] = 7, *, category: Optional[str] = None):
     try:
-        summary = generate_todo_summary_backlog(USERS)
+        users = select_users(member)
+        if users is None:
+            await ctx.send(f"⚠️ <@{member.id}> is not in the users list.")
+            return
+        summary = await asyncio.to_thread(generate_todo_summary_backlog, users, category, clamp_days(days))
         await ctx.send(summary if summary else "✅ No backlog items.")
     except Exception as e:
         await ctx.send("❌ An error occurred while fetching backlog items.")
         print("🚨 Error:", e, flush=True)
 
+# Cache of rendered summaries: key -> (expires_at, render task)
+# In-flight renders never expire, so identical concurrent requests share one fetch
+render_cache = {}
+
+# Start the expiry clock once a render finishes; failed or partial renders aren't kept
+def finish_render(key, task):
+    cached = render_cache.get(key)
+    if not cached or cached[1] is not task:
+        return
+    if task.cancelled() or task.exception() or task.result()[1]:
+        del render_cache[key]
+    else:
+        render_cache[key] = (monotonic() + RENDER_CACHE_SECONDS, task)
+
+# Render a summary off the event loop, reusing identical renders for RENDER_CACHE_SECONDS
+async def render_summary_cached(range_name, generate, users, *args):
+    now = monotonic()
+    # Every range is relative to today, so a render never outlives its Manila date
+    today_date = datetime.now(ZoneInfo("Asia/Manila")).date()
+    key = (range_name, today_date, tuple(sorted(users)), *args)
+    cached = render_cache.get(key)
+    if cached and cached[0] > now:
+        summary, _ = await asyncio.shield(cached[1])
+        return summary
+
+    # Drop expired renders so the cache stays small
+    for stale_key in [k for k, (expires_at, _) in render_cache.items() if expires_at <= now]:
+        del render_cache[stale_key]
+
+    task = asyncio.create_task(asyncio.to_thread(generate, users, *args, with_errors=True))
+    render_cache[key] = (float("inf"), task)
+    task.add_done_callback(lambda done: finish_render(key, done))
+    summary, _ = await asyncio.shield(task)
+    return summary
+
+# Acknowledge the interaction right away, then follow up with the rendered summary
+async def send_slash_summary(interaction, range_name, generate, member, args, empty_message, error_message):
+    await interaction.response.defer(thinking=True)
+    try:
+        users = select_users(member)
+        if users is None:
+            await interaction.followup.send(f"⚠️ <@{member.id}> is not in the users list.")
+            return
+        summary = await render_summary_cached(range_name, generate, users, *args)
+        await interaction.followup.send(summary if summary else empty_message)
+    except Exception as e:
+        await interaction.followup.send(error_message)
+        print("🚨 Error:", e, flush=True)
+
+# Slash command: /today
+@bot.tree.command(name="today", description="Fetch today's todos")
+@app_commands.describe(member="Only show this member's todos", category="Only show todos in this category/goal")
+async def today_slash(interaction: discord.Interaction, member: Optional[discord.Member] = None, category: Optional[str] = None):
+    await send_slash_summary(
+        interaction, "today", generate_todo_summary_today, member, (category,),
+        "✅ No todos scheduled for today.", "❌ An error occurred while fetching today's todos."
+    )
+
+# Slash command: /tom
+@bot.tree.command(name="tom", description="Fetch tomorrow's todos")
+@app_commands.describe(member="Only show this member's todos", category="Only show todos in this category/goal")
+async def tomorrow_slash(interaction: discord.Interaction, member: Optional[discord.Member] = None, category: Optional[str] = None):
+    await send_slash_summary(
+        interaction, "tom", generate_todo_summary_tomorrow, member, (category,),
+        "✅ No todos scheduled for tomorrow.", "❌ An error occurred while fetching tomorrow's todos."
+    )
+
+# Slash command: /week
+@bot.tree.command(name="week", description="Fetch upcoming todos")
+@app_commands.describe(member="Only show this member's todos", days="Number of days to look ahead", category="Only show todos in this category/goal")
+async def week_slash(interaction: discord.Interaction, member: Optional[discord.Member] = None, days: app_commands.Range[int, 1, MAX_RANGE_DAYS] = 7, category: Optional[str] = None):
+    await send_slash_summary(
+        interaction, "week", generate_todo_summary_week, member, (category, days),
+        "✅ No upcoming todos.", "❌ An error occurred while fetching upcoming todos."
+    )
+
+# Slash command: /backlog
+@bot.tree.command(name="backlog", description="Fetch unfinished todos from the past days")
+@app_commands.describe(member="Only show this member's todos", days="Number of days to look back", category="Only show todos in this category/goal")
+async def backlog_slash(interaction: discord.Interaction, member: Optional[discord.Member] = None, days: app_commands.Range[int, 1, MAX_RANGE_DAYS] = 7, category: Optional[str] = None):
+    await send_slash_summary(
+        interaction, "backlog", generate_todo_summary_backlog, member, (category, days),
+        "✅ No backlog items.", "❌ An error occurred while fetching backlog items."
+    )
+
 # Run Flask in separate thread
 def run_flask():
     port = int(os.environ.get("PORT", 8000))
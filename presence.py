@@ -0,0 +1,68 @@
+import asyncio
+
+
+# Tracks who is in each watched voice channel and debounces join/leave flaps
+class VoicePresenceTracker:
+    def __init__(self, watched_channels, debounce_seconds, on_join, on_leave):
+        self.watched_channels = set(watched_channels)
+        self.debounce_seconds = debounce_seconds
+        self.on_join = on_join
+        self.on_leave = on_leave
+        self.occupancy = {channel_id: set() for channel_id in self.watched_channels}
+        self.pending_joins = {}
+        self.pending_leaves = {}
+
+    # Reset a channel's occupancy from its current members (e.g. on startup/reconnect)
+    def seed(self, channel_id, member_ids):
+        if channel_id in self.watched_channels:
+            self.occupancy[channel_id] = set(member_ids)
+
+    def is_watched(self, channel_id):
+        return channel_id in self.watched_channels
+
+    # Handle a voice state change; channel IDs are None when not in a channel
+    async def update(self, member_id, before_id, after_id):
+        if before_id == after_id:
+            return  # mute/deafen/stream changes, not a move
+
+        if self.is_watched(before_id):
+            self._leave(member_id, before_id)
+
+        if self.is_watched(after_id):
+            self._join(member_id, after_id)
+
+    def _join(self, member_id, channel_id):
+        members = self.occupancy[channel_id]
+        was_empty = not members
+        members.add(member_id)
+
+        # Rejoined within the debounce window: drop the pending leave and stay quiet
+        pending = self.pending_leaves.pop((member_id, channel_id), None)
+        if pending:
+            pending.cancel()
+            return
+
+        if was_empty:
+            self._schedule(self.pending_joins, self.on_join, member_id, channel_id)
+
+    def _leave(self, member_id, channel_id):
+        self.occupancy[channel_id].discard(member_id)
+
+        # Left within the debounce window: drop the pending join and stay quiet
+        pending = self.pending_joins.pop((member_id, channel_id), None)
+        if pending:
+            pending.cancel()
+            return
+
+        self._schedule(self.pending_leaves, self.on_leave, member_id, channel_id)
+
+    # Send a notification after the debounce window unless it gets cancelled first
+    def _schedule(self, pending, notify, member_id, channel_id):
+        key = (member_id, channel_id)
+        if key not in pending:
+            pending[key] = asyncio.create_task(self._notify_later(pending, notify, member_id, channel_id))
+
+    async def _notify_later(self, pending, notify, member_id, channel_id):
+        await asyncio.sleep(self.debounce_seconds)
+        pending.pop((member_id, channel_id), None)
+        await notify(member_id, channel_id)
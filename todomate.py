@@ -19,18 +19,24 @@ def get_now_ms():
     end = datetime.now(ZoneInfo("Asia/Manila")).replace(hour=23, minute=59, second=59, microsecond=999000)
     return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
 
-# Function to get the next 7 days' range in milliseconds
-def get_week_ms():
+# Function to get the next N days' range in milliseconds (defaults to 7)
+def get_week_ms(days=7):
     start = datetime.now(ZoneInfo("Asia/Manila")).replace(hour=0, minute=0, second=0, microsecond=0)
-    end = (start + timedelta(days=6)).replace(hour=23, minute=59, second=59, microsecond=999000)
+    end = (start + timedelta(days=days - 1)).replace(hour=23, minute=59, second=59, microsecond=999000)
     return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
 
-# Function to get the previous month's range in milliseconds
-def get_prev_month_ms():
+# Function to get the previous N days' range in milliseconds (defaults to 7)
+def get_prev_month_ms(days=7):
     end = datetime.now(ZoneInfo("Asia/Manila")).replace(hour=0, minute=0, second=0, microsecond=0)
-    start = (end - timedelta(days=7)).replace(hour=23, minute=59, second=59, microsecond=999000)
+    start = end - timedelta(days=days)
     return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
 
+# Function to check if a todo belongs to a category/goal (case-insensitive, partial match)
+def matches_category(todo, category):
+    if not category:
+        return True
+    return category.lower() in (todo.get("category") or "").lower()
+
 load_dotenv()
 
 # Authenticate via Firebase
@@ -101,10 +107,12 @@ def fetch_todo_items_today(users):
 
     return json.dumps(all_results, indent=2, ensure_ascii=False)
 
-def generate_todo_summary_today(users_dict):
+# Summaries return (summary, failed_users) instead when with_errors=True
+def generate_todo_summary_today(users_dict, category_filter=None, with_errors=False):
     raw = fetch_todo_items_today(users_dict)
     todos_by_user = json.loads(raw) if isinstance(raw, str) else raw
     user_id_lookup = {v["todomate"]: k for k, v in users_dict.items() if "todomate" in v}
+    failed_users = []
     response = ""
 
     for internal_id, todos in todos_by_user.items():
@@ -113,9 +121,11 @@ def generate_todo_summary_today(users_dict):
             continue
 
         if isinstance(todos, dict) and "error" in todos:
+            failed_users.append(discord_id)
             response += f"<@{discord_id}> ⚠️ Error: {todos['error']}\n"
             continue
 
+        todos = [todo for todo in todos if matches_category(todo, category_filter)]
         if not todos:
             continue
 
@@ -137,7 +147,7 @@ def generate_todo_summary_today(users_dict):
                     response += f"  • {content}\n"
             response += "\n"
 
-    return response
+    return (response, failed_users) if with_errors else response
 
 def fetch_todo_items_for_date(users, target_date):
     start = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=ZoneInfo("Asia/Manila"))
@@ -188,11 +198,12 @@ def fetch_todo_items_for_date(users, target_date):
 
     return json.dumps(all_results, indent=2, ensure_ascii=False)
 
-def generate_todo_summary_tomorrow(users_dict):
+def generate_todo_summary_tomorrow(users_dict, category_filter=None, with_errors=False):
     target_date = datetime.now(ZoneInfo("Asia/Manila")).date() + timedelta(days=1)
     raw = fetch_todo_items_for_date(users_dict, target_date)
     todos_by_user = json.loads(raw) if isinstance(raw, str) else raw
     user_id_lookup = {v["todomate"]: k for k, v in users_dict.items() if "todomate" in v}
+    failed_users = []
     response = ""
 
     for internal_id, todos in todos_by_user.items():
@@ -200,6 +211,12 @@ def generate_todo_summary_tomorrow(users_dict):
         if not discord_id:
             continue
 
+        if isinstance(todos, dict) and "error" in todos:
+            failed_users.append(discord_id)
+            response += f"<@{discord_id}> ⚠️ Error: {todos['error']}\n"
+            continue
+
+        todos = [todo for todo in todos if matches_category(todo, category_filter)]
         if not todos:
             continue
 
@@ -221,11 +238,11 @@ def generate_todo_summary_tomorrow(users_dict):
                     response += f"  • {content}\n"
             response += "\n"
 
-    return response
+    return (response, failed_users) if with_errors else response
 
-# Function to fetch todo items for the next 7 days
-def fetch_todo_items_week(users):
-    start_time, end_time = get_week_ms()
+# Function to fetch todo items for the next N days
+def fetch_todo_items_week(users, days=7):
+    start_time, end_time = get_week_ms(days)
     all_results = {}
     api_url, headers = get_id_token()
 
@@ -269,10 +286,11 @@ def fetch_todo_items_week(users):
     return json.dumps(all_results, indent=2, ensure_ascii=False)
 
 # Function to format weekly summary grouped by date
-def generate_todo_summary_week(users_dict):
-    raw = fetch_todo_items_week(users_dict)
+def generate_todo_summary_week(users_dict, category_filter=None, days=7, with_errors=False):
+    raw = fetch_todo_items_week(users_dict, days)
     todos_by_user = json.loads(raw) if isinstance(raw, str) else raw
     user_id_lookup = {v["todomate"]: k for k, v in users_dict.items() if "todomate" in v}
+    failed_users = []
     todos_by_date = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
 
     for internal_id, todos in todos_by_user.items():
@@ -281,10 +299,14 @@ def generate_todo_summary_week(users_dict):
             continue
 
         if isinstance(todos, dict) and "error" in todos:
+            failed_users.append(discord_id)
             todos_by_date["Errors"][discord_id]["Errors"].append(f"⚠️ Error: {todos['error']}")
             continue
 
         for todo in todos:
+            if not matches_category(todo, category_filter):
+                continue
+
             date_key = todo.get("date", "Unknown Date").split()[0]
             category = todo.get("category", "Uncategorized")
             content = todo.get("content", "No content")
@@ -315,11 +337,12 @@ def generate_todo_summary_week(users_dict):
                 response += "\n"
         response += "\n"
 
-    return response or "✅ No upcoming todos in the next 7 days."
+    response = response or f"✅ No upcoming todos in the next {days} days."
+    return (response, failed_users) if with_errors else response
 
 # Function to fetch backlog items (incomplete tasks from previous periods)
-def fetch_backlog_items(users):
-    start_time, end_time = get_prev_month_ms()
+def fetch_backlog_items(users, days=7):
+    start_time, end_time = get_prev_month_ms(days)
     print(f"Fetching backlog items from {format_timestamp(start_time)} to {format_timestamp(end_time)}")
 
     all_results = {}
@@ -373,10 +396,11 @@ def fetch_backlog_items(users):
 
     return json.dumps(all_results, indent=2, ensure_ascii=False)
 
-def generate_todo_summary_backlog(users_dict):
-    raw = fetch_backlog_items(users_dict)
+def generate_todo_summary_backlog(users_dict, category_filter=None, days=7, with_errors=False):
+    raw = fetch_backlog_items(users_dict, days)
     todos_by_user = json.loads(raw) if isinstance(raw, str) else raw
     user_lookup = {v["todomate"]: k for k, v in users_dict.items() if "todomate" in v}
+    failed_users = []
     response = ""
 
     for internal_id, todos in todos_by_user.items():
@@ -385,9 +409,11 @@ def generate_todo_summary_backlog(users_dict):
             continue
 
         if isinstance(todos, dict) and "error" in todos:
+            failed_users.append(discord_id)
             response += f"<@{discord_id}> ⚠️ Error: {todos['error']}\n"
             continue
 
+        todos = [todo for todo in todos if matches_category(todo, category_filter)]
         if not todos:
             continue
 
@@ -408,4 +434,4 @@ def generate_todo_summary_backlog(users_dict):
                 response += f"  • {content} (from {formatted_date})\n"
             response += "\n"
 
-    return response
\ No newline at end of file
+    return (response, failed_users) if with_errors else response
\ No newline at end of file